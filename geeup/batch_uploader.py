@@ -26,9 +26,11 @@ import json
 import logging
 import os
 import platform
-import subprocess
+import re
 import sys
+import threading
 import time
+from concurrent.futures import Future
 
 import ee
 import pandas as pd
@@ -39,14 +41,27 @@ from cerberus.errors import BasicErrorHandler
 from natsort import natsorted
 from requests_toolbelt import MultipartEncoder
 
+from .ee_init import initialize_ee
+from .events import emit
 from .metadata_loader import load_metadata_from_csv
+from .state import load_state, new_state, save_state, state_path
+from .terminal import clear_screen, set_canonical_input
 
-os.chdir(os.path.dirname(os.path.realpath(__file__)))
 lp = os.path.dirname(os.path.realpath(__file__))
-sys.path.append(lp)
+platform_name = platform.system().lower()
+cookie_jar = os.path.join(lp, "cookie_jar.json")
 
 
-slist = []
+# Re-query the task queue every this many images; in between, submissions are
+# counted locally, which can only overestimate since tasks also finish
+TASK_RECOUNT_INTERVAL = 25
+
+# Files transferred at once, each on a daemon thread (see __start_transfer),
+# ahead of the sequential ingestion loop
+UPLOAD_WORKERS = 8
+
+ASSET_PATH_RE = re.compile(r"[a-zA-Z0-9/_-]+")
+INVALID_PATH_MESSAGE = "GEE file name & path cannot have spaces & can only have letters, numbers, hyphens and underscores"
 
 
 class CustomErrorHandler(BasicErrorHandler):
@@ -55,11 +70,11 @@ class CustomErrorHandler(BasicErrorHandler):
 
     def _format_message(self, field, error):
         print("")
-        return "GEE file name & path cannot have spaces & can only have letters, numbers, hyphens and underscores"
+        return INVALID_PATH_MESSAGE
 
 
 def task_counter():
-    ee.Initialize()
+    initialize_ee()
     status = ["RUNNING", "PENDING"]
     task_count = len(
         [
@@ -80,6 +95,8 @@ def upload(
     metadata_path=None,
     nodata_value=None,
     overwrite=None,
+    max_inflight_tasks=2800,
+    retry_failed=False,
 ):
     schema = {"collection_path": {"type": "string", "regex": "^[a-zA-Z0-9/_-]+$"}}
     collection_validate = {"collection_path": destination_path}
@@ -87,7 +104,7 @@ def upload(
     if v.validate(collection_validate, schema) is False:
         sys.exit(v.errors)
 
-    ee.Initialize()
+    initialize_ee()
 
     logging.basicConfig(
         format="%(asctime)s %(levelname)-4s %(message)s",
@@ -105,6 +122,32 @@ def upload(
     google_session = __get_google_auth_session(user)
 
     __create_image_collection(destination_path)
+    # Full asset name, so every spelling of the destination shares one checkpoint
+    asset_name = ee.data.getAsset(destination_path.rstrip("/") + "/")["name"]
+
+    # Per-destination checkpoint of what this run submitted or failed
+    checkpoint = state_path("upload", asset_name)
+    state = new_state("upload", source_path, asset_name)
+    if retry_failed:
+        previous = load_state(checkpoint)
+        if previous is None or not previous["failed"]:
+            print("No failed uploads recorded for %s" % destination_path)
+            return
+        failed = set(previous["failed"])
+        all_images_paths = [
+            image_path
+            for image_path in all_images_paths
+            if __get_filename_from_path(image_path) in failed
+        ]
+        # Carry over only the earlier tasks that have not finished yet
+        active = {
+            task["id"]
+            for task in ee.data.getTaskList()
+            if task["state"] in ("READY", "RUNNING")
+        }
+        state["inflight_task_ids"] = [
+            task_id for task_id in previous["inflight_task_ids"] if task_id in active
+        ]
 
     images_for_upload_path = __find_remaining_assets_for_upload(
         all_images_paths, destination_path, overwrite
@@ -115,132 +158,149 @@ def upload(
         print("No images found that match %s. Exiting...", path)
         sys.exit(1)
     file_count = len(images_for_upload_path)
-    for current_image_no, image_path in enumerate(natsorted(images_for_upload_path)):
-        # logging.info(
-        #     f"Processing image {current_image_no + 1} out of {no_images} : {image_path}"
-        # )
-        task_count = task_counter()
-        while task_count >= 2800:
-            logging.info(
-                f"Total tasks running or submitted {task_count}: waiting for 5 minutes"
-            )
-            time.sleep(300)
-            task_count = task_counter()
-        filename = __get_filename_from_path(path=image_path)
-
-        destination_path = ee.data.getAsset(destination_path + "/")["name"]
-        asset_full_path = destination_path + "/" + filename
-
-        if metadata and not filename in metadata:
-            print(
-                f"No metadata exists for image: {filename} ==>it will not be ingested"
-            )
-            continue
 
-        properties = metadata[filename] if metadata else None
-        try:
+    # Parse the metadata CSV once and index its rows by id_no
+    rows_by_id, intcol, floatcol, strcol = {}, [], [], []
+    if metadata_path:
+        df = pd.read_csv(metadata_path)
+        dd = (df.applymap(type) == str).all(0)
+        strcol = [ind for ind, val in dd.items() if val == True]
+        intcol = list(df.select_dtypes(include=["int64"]).columns)
+        floatcol = list(df.select_dtypes(include=["float64"]).columns)
+        with open(metadata_path, "r") as f:
+            rows_by_id = {
+                line["id_no"]: line for line in csv.DictReader(f, delimiter=",")
+            }
+    casters = {
+        **{integer: int for integer in intcol},
+        **{s: str for s in strcol},
+        **{f: float for f in floatcol},
+    }
+
+    # These do not change between images, so resolve them once
+    destination_path = asset_name
+    pyramidingPolicy = pyramiding.upper() if pyramiding is not None else "MEAN"
+    allow_overwrite = overwrite is not None and overwrite.lower() in ["yes", "y"]
+
+    # Manifest fields shared by every image; each payload is a shallow copy
+    payload_template = {"pyramidingPolicy": pyramidingPolicy}
+    if nodata_value is not None:
+        payload_template["missing_data"] = {"values": [nodata_value]}
+    if mask:
+        payload_template["maskBands"] = {"bandIds": [], "tilesetId": ""}
+    task_count = 0
+    images_for_upload_path = natsorted(images_for_upload_path)
+    uploads = {}
+    try:
+        for current_image_no, image_path in enumerate(images_for_upload_path):
+            # Keep the next few files transferring while this one is ingested
             if user is not None:
-                gsid = __upload_file_gee(session=google_session, file_path=image_path)
-
-            df = pd.read_csv(metadata_path)
-            dd = (df.applymap(type) == str).all(0)
-            for ind, val in dd.items():
-                if val == True:
-                    slist.append(ind)
-            intcol = list(df.select_dtypes(include=["int64"]).columns)
-            floatcol = list(df.select_dtypes(include=["float64"]).columns)
-            with open(metadata_path, "r") as f:
-                reader = csv.DictReader(f, delimiter=",")
-                for i, line in enumerate(reader):
-                    if line["id_no"] == os.path.basename(image_path).split(".tif")[0]:
-                        j = {}
-                        for integer in intcol:
-                            value = integer
-                            j[value] = int(line[integer])
-                        for s in slist:
-                            value = s
-                            j[value] = str(line[s])
-                        for f in floatcol:
-                            value = f
-                            j[value] = float(line[f])
-                        # j['id']=destination_path+'/'+line["id_no"]
-                        # j['tilesets'][0]['sources'][0]['primaryPath']=gsid
-                        if "system:time_start" in j:
-                            start = str(j["system:time_start"])
-                            if len(start) == 12:
-                                start = int(round(int(start) * 0.001))
-                            else:
-                                start = int(str(start)[:10])
-                            j.pop("system:time_start")
-                        elif "system:time_start" not in j:
-                            start = None
-                        if "system:time_end" in j:
-                            end = str(j["system:time_end"])
-                            if len(end) == 12:
-                                end = int(round(int(end) * 0.001))
-                            else:
-                                end = int(str(end)[:10])
-                            j.pop("system:time_end")
-                        elif "system:time_end" not in j:
-                            end = None
-                        if pyramiding is not None:
-                            pyramidingPolicy = pyramiding.upper()
-                        else:
-                            pyramidingPolicy = "MEAN"
-                        json_data = json.dumps(j)
-                        main_payload = {
-                            "name": asset_full_path,
-                            "pyramidingPolicy": pyramidingPolicy,
-                            "tilesets": [{"sources": [{"uris": gsid}]}],
-                            "start_time": {"seconds": ""},
-                            "end_time": {"seconds": ""},
-                            "properties": j,
-                            "missing_data": {"values": [nodata_value]},
-                            "maskBands": {"bandIds": [], "tilesetId": ""},
-                        }
-                        if start is not None:
-                            main_payload["start_time"]["seconds"] = start
-                        else:
-                            main_payload.pop("start_time")
-                        if end is not None:
-                            main_payload["end_time"]["seconds"] = end
-                        else:
-                            main_payload.pop("end_time")
-                        if nodata_value is None:
-                            main_payload.pop("missing_data")
-                        if bool(mask) is False:
-                            main_payload.pop("maskBands")
-
-                        # print(json.dumps(main_payload, indent=2))
-                        schema = {
-                            "asset_path": {
-                                "type": "string",
-                                "regex": "^[a-zA-Z0-9/_-]+$",
-                            }
-                        }
-                        asset_validate = {"asset_path": asset_full_path}
-                        v = Validator(schema, error_handler=CustomErrorHandler(schema))
-                        if v.validate(asset_validate, schema) is False:
-                            print(v.errors)
-                            raise Exception
-                        request_id = ee.data.newTaskId()[0]
-                        check_list = ["yes", "y"]
-                        if overwrite is not None and overwrite.lower() in check_list:
-                            output = ee.data.startIngestion(
-                                request_id, main_payload, allow_overwrite=True
-                            )
-                        else:
-                            output = ee.data.startIngestion(
-                                request_id, main_payload, allow_overwrite=False
-                            )
-                        logging.info(
-                            f"Ingesting {current_image_no+1} of {file_count} {str(os.path.basename(asset_full_path))} with Task Id: {output['id']} & status {output['started']}"
-                        )
-        except Exception as error:
-            print(error)
-            print("Upload of " + str(filename) + " has failed.")
-        except (KeyboardInterrupt, SystemExit) as error:
-            sys.exit("Program escaped by User")
+                for ahead in images_for_upload_path[
+                    current_image_no : current_image_no + UPLOAD_WORKERS
+                ]:
+                    if ahead not in uploads and (
+                        not metadata or __get_filename_from_path(ahead) in metadata
+                    ):
+                        uploads[ahead] = __start_transfer(google_session, ahead)
+            # logging.info(
+            #     f"Processing image {current_image_no + 1} out of {no_images} : {image_path}"
+            # )
+            if (
+                current_image_no % TASK_RECOUNT_INTERVAL == 0
+                or task_count >= max_inflight_tasks
+            ):
+                task_count = task_counter()
+            while task_count >= max_inflight_tasks:
+                logging.info(
+                    "Total tasks running or submitted %d: waiting for 5 minutes",
+                    task_count,
+                )
+                time.sleep(300)
+                task_count = task_counter()
+            filename = __get_filename_from_path(path=image_path)
+            asset_full_path = destination_path + "/" + filename
+
+            if metadata and not filename in metadata:
+                print(
+                    f"No metadata exists for image: {filename} ==>it will not be ingested"
+                )
+                continue
+
+            properties = metadata[filename] if metadata else None
+            try:
+                if user is not None:
+                    gsid = uploads.pop(image_path).result()
+
+                line = rows_by_id.get(os.path.basename(image_path).split(".tif")[0], {})
+                j = {key: cast(line[key]) for key, cast in casters.items()}
+                # j['id']=destination_path+'/'+line["id_no"]
+                # j['tilesets'][0]['sources'][0]['primaryPath']=gsid
+                if "system:time_start" in j:
+                    start = str(j["system:time_start"])
+                    if len(start) == 12:
+                        start = int(round(int(start) * 0.001))
+                    else:
+                        start = int(str(start)[:10])
+                    j.pop("system:time_start")
+                elif "system:time_start" not in j:
+                    start = None
+                if "system:time_end" in j:
+                    end = str(j["system:time_end"])
+                    if len(end) == 12:
+                        end = int(round(int(end) * 0.001))
+                    else:
+                        end = int(str(end)[:10])
+                    j.pop("system:time_end")
+                elif "system:time_end" not in j:
+                    end = None
+                main_payload = {
+                    **payload_template,
+                    "name": asset_full_path,
+                    "tilesets": [{"sources": [{"uris": gsid}]}],
+                    "properties": j,
+                }
+                if start is not None:
+                    main_payload["start_time"] = {"seconds": start}
+                if end is not None:
+                    main_payload["end_time"] = {"seconds": end}
+
+                # print(json.dumps(main_payload, indent=2))
+                if not ASSET_PATH_RE.fullmatch(asset_full_path):
+                    print({"asset_path": [INVALID_PATH_MESSAGE]})
+                    raise Exception
+                request_id = ee.data.newTaskId()[0]
+                output = ee.data.startIngestion(
+                    request_id, main_payload, allow_overwrite=allow_overwrite
+                )
+                logging.info(
+                    "Ingesting %d of %d %s with Task Id: %s & status %s",
+                    current_image_no + 1,
+                    file_count,
+                    os.path.basename(asset_full_path),
+                    output["id"],
+                    output["started"],
+                )
+                state["completed"].append(filename)
+                emit(
+                    "upload.file.completed",
+                    path=image_path,
+                    size=os.path.getsize(image_path),
+                    task_id=output["id"],
+                )
+                state["inflight_task_ids"].append(output["id"])
+                task_count += 1
+                if len(state["completed"]) % 25 == 0:
+                    save_state(checkpoint, state)
+            except Exception as error:
+                print(error)
+                print("Upload of " + str(filename) + " has failed.")
+                state["failed"].append(filename)
+                emit("upload.file.failed", path=image_path, error=str(error))
+    except KeyboardInterrupt:
+        # Transfers run on daemon threads, so exiting abandons any in flight
+        save_state(checkpoint, state)
+        sys.exit("Program escaped by User")
+    save_state(checkpoint, state)
 
 
 def __find_remaining_assets_for_upload(path_to_local_assets, path_remote, overwrite):
@@ -311,46 +371,43 @@ def cookie_check(cookie_list):
 
 
 def __get_google_auth_session(username):
-    ee.Initialize()
-    platform_info = platform.system().lower()
-    if str(platform_info) == "linux" or str(platform_info) == "darwin":
-        subprocess.check_call(["stty", "-icanon"])
-    if not os.path.exists("cookie_jar.json"):
+    initialize_ee()
+    if platform_name in ("linux", "darwin"):
+        set_canonical_input(False)
+    if not os.path.exists(cookie_jar):
         try:
             cookie_list = raw_input("Enter your Cookie List:  ")
         except Exception:
             cookie_list = input("Enter your Cookie List:  ")
         finally:
-            with open("cookie_jar.json", "w") as outfile:
+            with open(cookie_jar, "w") as outfile:
                 json.dump(json.loads(cookie_list), outfile)
         cookie_list = json.loads(cookie_list)
-    elif os.path.exists("cookie_jar.json"):
-        with open("cookie_jar.json") as json_file:
+    elif os.path.exists(cookie_jar):
+        with open(cookie_jar) as json_file:
             cookie_list = json.load(json_file)
         if cookie_check(cookie_list) is True:
             print("Using saved Cookies")
             cookie_list = cookie_list
-        elif cookie_check(cookie_list) is False:
+        else:
             try:
                 cookie_list = raw_input("Cookies Expired | Enter your Cookie List:  ")
             except Exception:
                 cookie_list = input("Cookies Expired | Enter your Cookie List:  ")
             finally:
-                with open("cookie_jar.json", "w") as outfile:
+                with open(cookie_jar, "w") as outfile:
                     json.dump(json.loads(cookie_list), outfile)
                     cookie_list = json.loads(cookie_list)
-    time.sleep(5)
-    if str(platform.system().lower()) == "windows":
-        os.system("cls")
-    elif str(platform.system().lower()) == "linux":
-        os.system("clear")
-        subprocess.check_call(["stty", "icanon"])
-    elif str(platform.system().lower()) == "darwin":
-        os.system("clear")
-        subprocess.check_call(["stty", "icanon"])
-    else:
+    if platform_name not in ("windows", "linux", "darwin"):
         sys.exit(f"Operating system is not supported")
+    clear_screen()
+    set_canonical_input(True)
     session = requests.Session()
+    # Size the pool for the concurrent transfers so their connections are reused
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=UPLOAD_WORKERS, pool_maxsize=UPLOAD_WORKERS
+    )
+    session.mount("https://", adapter)
     for cookies in cookie_list:
         session.cookies.set(cookies["name"], cookies["value"])
     response = session.get("https://code.earthengine.google.com/assets/upload/geturl")
@@ -394,6 +451,23 @@ def __upload_file_gee(session, file_path):
             print(e)
 
 
+def __start_transfer(session, file_path):
+    # A daemon thread per file (the caller bounds how many are in flight), so
+    # Ctrl-C can exit without waiting for whole-file uploads to finish
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(__upload_file_gee(session=session, file_path=file_path))
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
 @retrying.retry(
     retry_on_exception=retry_if_ee_error,
     wait_exponential_multiplier=1000,
@@ -408,8 +482,18 @@ def __get_number_of_running_tasks():
     return len([task for task in ee.data.getTaskList() if task["state"] == "RUNNING"])
 
 
+# getInfo results by asset path, so repeated existence checks cost one round-trip
+_asset_info_cache = {}
+
+
+def __get_asset_info(path):
+    if path not in _asset_info_cache:
+        _asset_info_cache[path] = ee.data.getInfo(path)
+    return _asset_info_cache[path]
+
+
 def __collection_exist(path):
-    return True if ee.data.getInfo(path) else False
+    return True if __get_asset_info(path) else False
 
 
 def __create_image_collection(full_path_to_collection):
@@ -425,6 +509,7 @@ def __create_image_collection(full_path_to_collection):
             ee.data.createAsset(
                 {"type": ee.data.ASSET_TYPE_IMAGE_COLL}, full_path_to_collection
             )
+        _asset_info_cache.pop(full_path_to_collection, None)
 
 
 def __get_asset_names_from_collection(collection_path):
@@ -0,0 +1,45 @@
+__copyright__ = """
+
+    Copyright 2023 Samapriya Roy
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+"""
+__license__ = "Apache 2.0"
+
+_ee_initialized = False
+
+# Earth Engine endpoint tuned for many concurrent automated requests
+HIGH_VOLUME_URL = "https://earthengine-highvolume.googleapis.com"
+
+
+def initialize_ee(high_volume=False):
+    """
+    Initialize Earth Engine on first use and reuse that session afterwards.
+
+    Args:
+        high_volume (bool): Use the high-volume endpoint, meant for workloads
+            that issue many parallel requests.
+
+    Returns:
+        None
+    """
+    global _ee_initialized
+    if not _ee_initialized:
+        import ee
+
+        kwargs = {}
+        if high_volume:
+            kwargs["opt_url"] = HIGH_VOLUME_URL
+        ee.Initialize(**kwargs)
+        _ee_initialized = True
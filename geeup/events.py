@@ -0,0 +1,36 @@
+__copyright__ = """
+
+    Copyright 2023 Samapriya Roy
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+"""
+__license__ = "Apache 2.0"
+
+import json
+import time
+
+EVENT_SINK = None
+
+
+def open_event_sink(path):
+    """Send events to path as newline-delimited JSON for the rest of the process."""
+    global EVENT_SINK
+    EVENT_SINK = open(path, "a", buffering=1)
+
+
+def emit(name, **fields):
+    """Write one event line; does nothing unless --events-jsonl was given."""
+    if EVENT_SINK is None:
+        return
+    EVENT_SINK.write(json.dumps({"ts": time.time(), "event": name, **fields}) + "\n")
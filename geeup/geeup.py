@@ -18,32 +18,55 @@ __copyright__ = """
 __license__ = "Apache 2.0"
 
 import argparse
+import atexit
+import contextlib
 import csv
+import fnmatch
+import importlib
+import functools
 import json
 import logging
 import os
 import platform
+import queue
 import re
+import shutil
+import string
 import subprocess
 import sys
+import threading
 import time
 import webbrowser
-from datetime import datetime
-from zipfile import ZipFile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from zipfile import ZIP_DEFLATED, ZipFile
 
-import ee
-import pkg_resources
-import requests
+from .ee_init import initialize_ee
+from .events import emit, open_event_sink
+from .terminal import ThrottledStatus, clear_screen, set_canonical_input
 
-from .batch_uploader import upload
-from .tuploader import tabup
+try:
+    import orjson
 
-os.chdir(os.path.dirname(os.path.realpath(__file__)))
-lpath = os.path.dirname(os.path.realpath(__file__))
-sys.path.append(lpath)
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+
+except ImportError:
+
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
 
-if len(sys.argv) > 1 and sys.argv[1] != "-h":
-    ee.Initialize()
+
+lpath = os.path.dirname(os.path.realpath(__file__))
+platform_name = platform.system().lower()
+cookie_jar = os.path.join(lpath, "cookie_jar.json")
 
 # Set a custom log formatter
 logging.basicConfig(
@@ -51,75 +74,118 @@ logging.basicConfig(
 )
 
 
-class Solution:
-    def compareVersion(self, version1, version2):
-        versions1 = [int(v) for v in version1.split(".")]
-        versions2 = [int(v) for v in version2.split(".")]
-        for i in range(max(len(versions1), len(versions2))):
-            v1 = versions1[i] if i < len(versions1) else 0
-            v2 = versions2[i] if i < len(versions2) else 0
-            if v1 > v2:
-                return 1
-            elif v1 < v2:
-                return -1
+def compare_version(version1, version2):
+    """
+    Compare two version strings under PEP 440.
+
+    Args:
+        version1 (str): Version to compare.
+        version2 (str): Version to compare against.
+
+    Returns:
+        int: 1, -1 or 0 as version1 is newer than, older than or equal to
+            version2; 0 when either string is not a valid PEP 440 version.
+    """
+    from packaging.version import InvalidVersion, Version
+
+    try:
+        v1, v2 = Version(version1), Version(version2)
+    except InvalidVersion as e:
+        logging.debug("Cannot compare versions %r and %r: %s", version1, version2, e)
         return 0
+    return (v1 > v2) - (v1 < v2)
+
+
+VERSION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "geeup", "pypi")
+VERSION_CACHE_TTL = 86400
+
+
+_pypi_session = None
 
 
-ob1 = Solution()
+# Build one pooled, retrying session for PyPI lookups on first use
+def pypi_session():
+    global _pypi_session
+    if _pypi_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
 
-if str(platform.system().lower()) == "windows":
-    version = sys.version_info[0]
+        retry = Retry(
+            total=2, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504]
+        )
+        session = requests.Session()
+        session.mount(
+            "https://",
+            HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=4),
+        )
+        _pypi_session = session
+    return _pypi_session
+
+
+# Get package version, reusing the on-disk copy for ttl seconds
+def version_latest(package, ttl=VERSION_CACHE_TTL):
+    cache_file = os.path.join(VERSION_CACHE_DIR, f"{package}.json")
+    cached_version = None
     try:
-        import pipgeo
+        with open(cache_file, "rb") as infile:
+            cached_version = _json_loads(infile.read())["version"]
+        if time.time() - os.path.getmtime(cache_file) < ttl:
+            return cached_version
+    except (OSError, ValueError, KeyError):
+        pass
+    import requests
 
-        response = requests.get("https://pypi.org/pypi/pipgeo/json")
-        latest_version = response.json()["info"]["version"]
-        vcheck = ob1.compareVersion(
-            latest_version,
-            pkg_resources.get_distribution("pipgeo").version,
+    try:
+        # Short connect timeout so offline machines give up in about a second
+        response = pypi_session().get(
+            f"https://pypi.org/pypi/{package}/json", timeout=(1, 3)
         )
-        if vcheck == 1:
-            subprocess.call(
-                f"{sys.executable}" + " -m pip install pipgeo --upgrade", shell=True
-            )
-    except ImportError:
-        subprocess.call(f"{sys.executable}" + " -m pip install pipgeo", shell=True)
-    except Exception as e:
-        logging.exception(e)
+        latest_version = response.json()["info"]["version"]
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        logging.debug("PyPI lookup for %s failed: %s", package, e)
+        if cached_version is not None:
+            return cached_version
+        raise
     try:
-        import gdal
-    except ImportError:
-        try:
-            from osgeo import gdal
-        except ModuleNotFoundError:
-            subprocess.call("pipgeo fetch --lib gdal", shell=True)
-    except ModuleNotFoundError or ImportError:
-        subprocess.call("pipgeo fetch --lib gdal", shell=True)
-    except Exception as e:
-        logging.exception(e)
+        os.makedirs(VERSION_CACHE_DIR, exist_ok=True)
+        # Write then rename so concurrent runs never read a partial file
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as outfile:
+            outfile.write(_json_dumps({"version": latest_version}))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logging.debug(e)
+    return latest_version
+
+
+_version_results = queue.Queue()
+
+
+def _fetch_version():
+    from importlib.metadata import version as package_version
+
     try:
-        import pandas
-    except ImportError:
-        subprocess.call(f"{sys.executable}" + " -m pip install pandas", shell=True)
+        _version_results.put((package_version("geeup"), version_latest("geeup")))
     except Exception as e:
-        logging.exception(e)
+        logging.debug(e)
 
-lpath = os.path.dirname(os.path.realpath(__file__))
-sys.path.append(lpath)
 
-
-# Get package version
-def version_latest(package):
-    response = requests.get(f"https://pypi.org/pypi/{package}/json")
-    latest_version = response.json()["info"]["version"]
-    return latest_version
+def _start_version_check():
+    # Skip the PyPI round-trip for scripted or opted-out invocations
+    if os.environ.get("GEEUP_NO_VERSION_CHECK") or not sys.stdout.isatty():
+        return
+    threading.Thread(target=_fetch_version, daemon=True).start()
+    atexit.register(geeup_version)
 
 
+# Report the background check only if it finished before the command did
 def geeup_version():
-    vcheck = ob1.compareVersion(
-        version_latest("geeup"),
-        pkg_resources.get_distribution("geeup").version,
-    )
+    try:
+        installed_version, latest_version = _version_results.get(timeout=0)
+    except queue.Empty:
+        return
+    vcheck = compare_version(latest_version, installed_version)
     if vcheck == 1:
         print(
             "\n"
@@ -127,8 +193,8 @@ def geeup_version():
         )
         print(
             "Current version of geeup is {} upgrade to lastest version: {}".format(
-                pkg_resources.get_distribution("geeup").version,
-                version_latest("geeup"),
+                installed_version,
+                latest_version,
             )
         )
         print(
@@ -141,8 +207,8 @@ def geeup_version():
         )
         print(
             "Possibly running staging code {} compared to pypi release {}".format(
-                pkg_resources.get_distribution("geeup").version,
-                version_latest("geeup"),
+                installed_version,
+                latest_version,
             )
         )
         print(
@@ -150,9 +216,6 @@ def geeup_version():
         )
 
 
-geeup_version()
-
-
 # Go to the readMe
 def readme():
     try:
@@ -164,31 +227,131 @@ def readme():
         logging.exception(e)
 
 
-def read_from_parser(args):
-    readme()
+def _run_checked(command):
+    """Run a command without a shell, logging instead of raising on failure."""
+    try:
+        subprocess.check_call(command)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.exception(e)
+
+
+# Windows dependency bootstrap
+def windows_bootstrap():
+    """
+    Install or upgrade pipgeo and use it to fetch GDAL, and install pandas if missing.
+
+    Only runs on Windows, where GDAL has no pip-installable wheel.
+
+    Returns:
+        None
+    """
+    if platform_name != "windows":
+        print("Dependency setup is only needed on Windows")
+        return
+    try:
+        import pipgeo
+        from importlib.metadata import version as package_version
+
+        # pipgeo changes rarely, so its release is only looked up once a week
+        vcheck = compare_version(
+            version_latest("pipgeo", ttl=7 * VERSION_CACHE_TTL),
+            package_version("pipgeo"),
+        )
+        if vcheck == 1:
+            _run_checked(
+                [sys.executable, "-m", "pip", "install", "--upgrade", "pipgeo"]
+            )
+    except ImportError:
+        _run_checked([sys.executable, "-m", "pip", "install", "pipgeo"])
+    except Exception as e:
+        logging.exception(e)
+    try:
+        from osgeo import gdal
+    except ImportError:
+        try:
+            import gdal
+        except ImportError:
+            pipgeo_path = shutil.which("pipgeo")
+            if pipgeo_path is None:
+                logging.error("pipgeo is not on PATH, cannot fetch GDAL")
+            else:
+                _run_checked([pipgeo_path, "fetch", "--lib", "gdal"])
+    try:
+        import pandas
+    except ImportError:
+        _run_checked([sys.executable, "-m", "pip", "install", "pandas"])
+
+
+INVALID_CHARS_RE = re.compile(r"[^a-zA-Z0-9 _-]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Deletion table for ASCII names, str.translate avoids the regex engine entirely
+ALLOWED_CHARS = set(string.ascii_letters + string.digits + " _-")
+INVALID_ASCII_TABLE = {i: None for i in range(128) if chr(i) not in ALLOWED_CHARS}
+
+
+def sanitize_filename(file_name):
+    """Strip characters Earth Engine rejects and collapse whitespace to underscores."""
+    if file_name.isascii():
+        cleaned = file_name.translate(INVALID_ASCII_TABLE)
+    else:
+        cleaned = INVALID_CHARS_RE.sub("", file_name)
+    return WHITESPACE_RE.sub("_", cleaned)
 
 
 def rename(directory):
     """
     Rename files in a directory by removing invalid characters and replacing spaces with underscores.
 
+    If two files sanitize to the same name, a numeric suffix is added so neither is overwritten.
+
     Args:
         directory (str): The path to the directory containing the files to be renamed.
 
     Returns:
         None
     """
-    file_list = [file for file in os.listdir(directory)]
-    for i, file_original in enumerate(file_list):
+    with os.scandir(directory) as entries:
+        file_list = [entry.name for entry in entries if entry.is_file()]
+
+    # Plan every rename before touching the filesystem to catch collisions
+    taken = set(file_list)
+    plan = []
+    for file_original in file_list:
         file_name, file_extension = os.path.splitext(file_original)
-        string = re.sub(r"[^a-zA-Z0-9 _-]", r"", file_name)
-        string = re.sub(r"\s+", "_", string)
-        if file_original != string:
-            print(f"Renaming {file_original} to {string}{file_extension}")
-            os.rename(
-                os.path.join(directory, file_original),
-                os.path.join(directory, f"{string}{file_extension}"),
-            )
+        clean_name = sanitize_filename(file_name)
+        new_name = f"{clean_name}{file_extension}"
+        if new_name == file_original:
+            continue
+        counter = 1
+        while new_name in taken:
+            new_name = f"{clean_name}_{counter}{file_extension}"
+            counter += 1
+        taken.add(new_name)
+        plan.append((file_original, new_name))
+
+    for file_original, new_name in plan:
+        os.rename(
+            os.path.join(directory, file_original),
+            os.path.join(directory, new_name),
+        )
+    print(f"Renamed {len(plan)} of {len(file_list)} files in {directory}")
+
+
+def _iter_shapefiles(directory):
+    """Yield paths to .shp files under directory, recursing without following symlinks."""
+    # Like os.walk, skip folders that cannot be read rather than abort the run
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError as e:
+        logging.warning("Skipping folder %s: %s", directory, e)
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_shapefiles(entry.path)
+        elif entry.name.endswith(".shp"):
+            yield entry.path
 
 
 # Function to zip shapefile component files in folder
@@ -203,75 +366,89 @@ def zipshape(directory, export):
     Returns:
         None
     """
-    # List of valid extensions for shapefiles
-    ex = [".shp", ".prj", ".dbf", ".shx"]
-
-    # Walk through the directory and its subdirectories
-    for root, directories, files in os.walk(directory):
-        for filename in files:
-            if filename.endswith(".shp"):
-                filebase = os.path.splitext(filename)[0]
-                file_paths = [os.path.join(root, filebase + ext) for ext in ex]
-
-                # Check if there are at least 4 necessary files for a shapefile pkg
-                if len(file_paths) == 4:
-                    output_zip = os.path.join(export, filebase + ".zip")
-
-                    # Check if the ZIP archive already exists
-                    if not os.path.exists(output_zip):
-                        try:
-                            with ZipFile(output_zip, "w") as zipf:
-                                logging.info(
-                                    f"Creating zipped folder {filebase}.zip at {export}"
-                                )
-                                for file_path in file_paths:
-                                    fname = os.path.basename(file_path)
-                                    zipf.write(file_path, fname)
-                        except Exception as e:
-                            logging.exception(e)
-                    else:
-                        logging.info(f"File already exists: {output_zip}, SKIPPING")
+    # Mandatory shapefile components, plus optional ones zipped when present
+    required = [".shp", ".shx", ".dbf"]
+    optional = [".prj"]
+
+    for shp_path in _iter_shapefiles(directory):
+        pathbase = os.path.splitext(shp_path)[0]
+        filebase = os.path.basename(pathbase)
+
+        # Check the necessary files for a shapefile pkg are all present
+        missing = [ext for ext in required if not os.path.exists(pathbase + ext)]
+        if missing:
+            logging.info(
+                "Missing %s for %s.shp, SKIPPING", ", ".join(missing), filebase
+            )
+            continue
+        file_paths = [pathbase + ext for ext in required] + [
+            pathbase + ext for ext in optional if os.path.exists(pathbase + ext)
+        ]
+        output_zip = os.path.join(export, filebase + ".zip")
+
+        # Check if the ZIP archive already exists
+        if not os.path.exists(output_zip):
+            try:
+                with open(output_zip, "wb", buffering=1 << 20) as raw, ZipFile(
+                    raw, "w", compression=ZIP_DEFLATED, compresslevel=6
+                ) as zipf:
+                    logging.info(
+                        "Creating zipped folder %s.zip at %s", filebase, export
+                    )
+                    for file_path in file_paths:
+                        fname = os.path.basename(file_path)
+                        zipf.write(file_path, fname)
+            except Exception as e:
+                logging.exception(e)
+        else:
+            logging.info("File already exists: %s, SKIPPING", output_zip)
 
 
 # cookie setup
 def cookie_setup():
-    platform_info = platform.system().lower()
-    if str(platform_info) == "linux" or str(platform_info) == "darwin":
-        subprocess.check_call(["stty", "-icanon"])
+    if platform_name in ("linux", "darwin"):
+        set_canonical_input(False)
     try:
         cookie_list = raw_input("Enter your Cookie List:  ")
     except Exception:
         cookie_list = input("Enter your Cookie List:  ")
     finally:
-        with open("cookie_jar.json", "w") as outfile:
-            json.dump(json.loads(cookie_list), outfile)
-    time.sleep(3)
-    if str(platform_info) == "windows":
-        os.system("cls")
-    elif str(platform_info) == "linux":
-        os.system("clear")
-        subprocess.check_call(["stty", "icanon"])
-    elif str(platform_info) == "darwin":
-        os.system("clear")
-        subprocess.check_call(["stty", "icanon"])
-    else:
+        with open(cookie_jar, "wb") as outfile:
+            outfile.write(_json_dumps(_json_loads(cookie_list)))
+    if platform_name not in ("windows", "linux", "darwin"):
         sys.exit("Operating system not supported")
+    clear_screen()
+    set_canonical_input(True)
     print("\n" + "Cookie Setup completed")
 
 
 suffixes = ["B", "KB", "MB", "GB", "TB", "PB"]
 
 
-def humansize(nbytes):
-    i = 0
-    while nbytes >= 1024 and i < len(suffixes) - 1:
-        nbytes /= 1024.0
-        i += 1
-    f = ("%.2f" % nbytes).rstrip("0").rstrip(".")
+def _suffix_index(nbytes):
+    # Each suffix step is a 10-bit shift; bit_length is exact where a float
+    # log can land just under a power of 1024 (e.g. 1 PB reads as 1024 TB)
+    if nbytes < 1024:
+        return 0
+    return min((int(nbytes).bit_length() - 1) // 10, len(suffixes) - 1)
+
+
+def _format_size(nbytes, i):
+    f = "%.2f" % (nbytes / (1 << (10 * i)))
+    # Only strip when there is a trailing zero to drop, e.g. "1.50" or "2.00"
+    if f.endswith("0"):
+        f = f.rstrip("0").rstrip(".")
     return "%s %s" % (f, suffixes[i])
 
 
+def humansize(nbytes):
+    return _format_size(nbytes, _suffix_index(nbytes))
+
+
 def quota(project):
+    import ee
+
+    initialize_ee()
     if project is not None:
         try:
             if not project.endswith("/"):
@@ -284,7 +461,7 @@ def quota(project):
                 print(
                     "Used {} of {}".format(
                         humansize(int(project_detail["quota"]["sizeBytes"])),
-                        (humansize(int(project_detail["quota"]["maxSizeBytes"]))),
+                        humansize(int(project_detail["quota"]["maxSizeBytes"])),
                     )
                 )
             else:
@@ -330,6 +507,17 @@ def quota(project):
             )
 
 
+@contextlib.contextmanager
+def _gdal_config_option(gdal, key, value):
+    """Set a GDAL config option for the duration of a block and restore it after."""
+    previous = gdal.GetConfigOption(key)
+    gdal.SetConfigOption(key, value)
+    try:
+        yield
+    finally:
+        gdal.SetConfigOption(key, previous)
+
+
 def getmeta(indir, mfile):
     """
     Generate metadata from TIFF files in a directory and save it to a CSV file.
@@ -348,198 +536,251 @@ def getmeta(indir, mfile):
             import gdal
         except ImportError:
             sys.exit("GDAL library is not available. Please install it.")
+
+    def probe_tif(tif_file):
+        filename, file_path = tif_file
+        try:
+            # Only the GeoTIFF driver needs probing for .tif inputs
+            gtif = gdal.OpenEx(file_path, gdal.OF_RASTER, allowed_drivers=["GTiff"])
+            if gtif is None:
+                print(f"{filename}: {gdal.GetLastErrorMsg()}")
+                return None
+            fname = os.path.splitext(os.path.basename(filename))[0]
+            return [fname, gtif.RasterXSize, gtif.RasterYSize, gtif.RasterCount]
+        except Exception as e:
+            print(e)
+            return None
+
     try:
-        i = 1
-        tif_files = [
-            filename for filename in os.listdir(indir) if filename.endswith(".tif")
-        ]
+        with os.scandir(indir) as entries:
+            tif_files = [
+                (entry.name, entry.path)
+                for entry in entries
+                if entry.is_file() and entry.name.endswith(".tif")
+            ]
         flength = len(tif_files)
 
-        with open(mfile, "w", newline="") as csvfile:
-            fieldnames = ["id_no", "xsize", "ysize", "num_bands"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+        # A 1 MiB buffer turns per-row writes into a few large writes
+        with open(mfile, "w", newline="", buffering=1 << 20) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["id_no", "xsize", "ysize", "num_bands"])
+            # Without this every open lists the whole directory looking for
+            # sidecar files, which is quadratic for folders of many tiffs
+            with _gdal_config_option(gdal, "GDAL_DISABLE_READDIR_ON_OPEN", "EMPTY_DIR"):
+                # GDAL releases the GIL while reading headers, so threads overlap
+                # I/O; header reads are I/O bound, so allow more workers than cores
+                workers = min(16, (os.cpu_count() or 1) * 2) if flength > 8 else 1
+                # GDAL error handlers are per thread, so each worker installs
+                # the quiet handler once and failures are reported by probe_tif
+                with ThreadPoolExecutor(
+                    max_workers=workers,
+                    initializer=gdal.PushErrorHandler,
+                    initargs=("CPLQuietErrorHandler",),
+                ) as executor:
+                    for i, row in enumerate(executor.map(probe_tif, tif_files), 1):
+                        # Throttle progress output rather than flushing once per file
+                        if i % 64 == 0 or i == flength:
+                            sys.stdout.write(f"\rProcessed: {i} of {flength}")
+                            sys.stdout.flush()
+                        if row is not None:
+                            writer.writerow(row)
 
-        for filename in tif_files:
-            print(f"Processed: {i} of {flength}", end="\r")
-            gtif = gdal.Open(os.path.join(indir, filename))
+    except ImportError:
+        print("GDAL library is not available. Please install it.")
 
-            try:
-                fname = os.path.splitext(os.path.basename(filename))[0]
-                xsize = gtif.RasterXSize
-                ysize = gtif.RasterYSize
-                bsize = gtif.RasterCount
 
-                with open(mfile, "a", newline="") as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow([fname, xsize, ysize, bsize])
+def _format_task(operation):
+    """Summarize a task from ee.data.getTaskList() for JSON output."""
+    item = {
+        "task_id": operation["id"],
+        "operation_type": operation["task_type"],
+        "description": operation["description"].split(":")[0],
+        "run_time": str(
+            timedelta(
+                milliseconds=operation["update_timestamp_ms"]
+                - operation["start_timestamp_ms"]
+            )
+        ),
+        "attempt": operation["attempt"],
+    }
+    if "destination_uris" in operation:
+        item["item_path"] = operation["destination_uris"][0].replace(
+            "https://code.earthengine.google.com/?asset=", ""
+        )
+    if "batch_eecu_usage_seconds" in operation:
+        item["eecu_usage"] = operation["batch_eecu_usage_seconds"]
+    return item
 
-                i += 1
-            except Exception as e:
-                print(e)
-                i += 1
 
-    except ImportError:
-        print("GDAL library is not available. Please install it.")
+TASK_LIST_TTL = 30
+
 
+@functools.lru_cache(maxsize=1)
+def _cached_task_list(ts_bucket):
+    import ee
 
-def epoch_convert_time(epoch_timestamp):
-    dt_object = datetime.fromtimestamp(epoch_timestamp / 1000)
-    formatted_date_time = dt_object.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-    return formatted_date_time
+    return ee.data.getTaskList()
+
+
+def get_task_list():
+    """Return ee.data.getTaskList(), reusing the result for up to TASK_LIST_TTL seconds."""
+    return _cached_task_list(int(time.time()) // TASK_LIST_TTL)
 
 
 def tasks(state, id):
+    initialize_ee()
+    task_list = get_task_list()
     if state is not None:
-        task_bundle = []
-        operations = [
-            status
-            for status in ee.data.getTaskList()
+        task_bundle = [
+            _format_task(status)
+            for status in task_list
             if status["state"] == state.upper()
         ]
-        for operation in operations:
-            task_id = operation["id"]
-            description = operation["description"].split(":")[0]
-            op_type = operation["task_type"]
-            attempt_count = operation["attempt"]
-            date_format = "%Y-%m-%dT%H:%M:%S.%fZ"
-            start = datetime.strptime(
-                epoch_convert_time(operation["start_timestamp_ms"]), date_format
-            )
-            end = datetime.strptime(
-                epoch_convert_time(operation["update_timestamp_ms"]), date_format
-            )
-            time_difference = end - start
-            item = {
-                "task_id": task_id,
-                "operation_type": op_type,
-                "description": description,
-                "run_time": str(time_difference),
-                "attempt": attempt_count,
-            }
-            if "destination_uris" in operation:
-                item["item_path"] = operation["destination_uris"][0].replace(
-                    "https://code.earthengine.google.com/?asset=", ""
-                )
-            if "batch_eecu_usage_seconds" in operation:
-                item["eecu_usage"] = operation["batch_eecu_usage_seconds"]
-            task_bundle.append(item)
         print(json.dumps(task_bundle, indent=2))
     elif id is not None:
-        operations = [status for status in ee.data.getTaskList() if status["id"] == id]
-        for operation in operations:
-            task_id = operation["id"]
-            description = operation["description"].split(":")[0]
-            op_type = operation["task_type"]
-            attempt_count = operation["attempt"]
-            date_format = "%Y-%m-%dT%H:%M:%S.%fZ"
-            start = datetime.strptime(
-                epoch_convert_time(operation["start_timestamp_ms"]), date_format
-            )
-            end = datetime.strptime(
-                epoch_convert_time(operation["update_timestamp_ms"]), date_format
-            )
-            time_difference = end - start
-            item = {
-                "task_id": task_id,
-                "operation_type": op_type,
-                "description": description,
-                "run_time": str(time_difference),
-                "attempt": attempt_count,
-            }
-            if "destination_uris" in operation:
-                item["item_path"] = operation["destination_uris"][0].replace(
-                    "https://code.earthengine.google.com/?asset=", ""
-                )
-            if "batch_eecu_usage_seconds" in operation:
-                item["eecu_usage"] = operation["batch_eecu_usage_seconds"]
-            print(json.dumps(item, indent=2))
+        tasks_by_id = {status["id"]: status for status in task_list}
+        if id in tasks_by_id:
+            print(json.dumps(_format_task(tasks_by_id[id]), indent=2))
     else:
-        statuses = ee.data.getTaskList()
-        st = []
-        for status in statuses:
-            st.append(status["state"])
-        print(f"Tasks Running: {st.count('RUNNING')}")
-        print(f"Tasks Pending: {st.count('READY')}")
-        print(f"Tasks Completed: {st.count('COMPLETED')+st.count('SUCCEEDED')}")
-        print(f"Tasks Failed: {st.count('FAILED')}")
-        print(f"Tasks Cancelled: {st.count('CANCELLED') + st.count('CANCELLING')}")
+        st = Counter(status["state"] for status in task_list)
+        print(f"Tasks Running: {st['RUNNING']}")
+        print(f"Tasks Pending: {st['READY']}")
+        print(f"Tasks Completed: {st['COMPLETED']+st['SUCCEEDED']}")
+        print(f"Tasks Failed: {st['FAILED']}")
+        print(f"Tasks Cancelled: {st['CANCELLED'] + st['CANCELLING']}")
 
 
-def cancel_tasks(tasks):
-    if tasks == "all":
-        try:
-            print("Attempting to cancel all tasks")
-            all_tasks = [
-                task
-                for task in ee.data.getTaskList()
-                if task["state"] == "RUNNING" or task["state"] == "READY"
-            ]
-            if len(all_tasks) > 0:
-                for i, task in enumerate(all_tasks):
-                    ee.data.cancelOperation(task["name"])
-                    logging.info(
-                        f"Canceling {task['state'].lower()} Task {i+1} of {len(all_tasks)} with Task ID: {task['id']}"
-                    )
-                print(
-                    "Request completed with task ID or task type {} cancelled".format(
-                        tasks
-                    )
-                )
-            elif len(all_tasks) == 0:
-                print("No Running or Pending tasks found")
-        except Exception as e:
-            logging.exception(e)
-    elif tasks == "running":
+def _cloud_api_resource():
+    """Return the discovery-built Earth Engine client used by ee.data, if exposed."""
+    import ee
+
+    get_state = getattr(ee.data, "_get_state", None)
+    if get_state is not None:
+        return getattr(get_state(), "cloud_api_resource", None)
+    return getattr(ee.data, "_cloud_api_resource", None)
+
+
+# HTTP statuses a batched cancel is retried for through ee.data.cancelOperation
+RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+
+
+def cancel_operations(task_list, batch_size=100):
+    """
+    Cancel Earth Engine operations, grouping the cancel calls into batched HTTP requests.
+
+    Falls back to issuing the cancel calls from a thread pool when the batch client is unavailable,
+    and for any calls a failed or rate-limited batch did not complete.
+
+    Args:
+        task_list (list): Task dictionaries as returned by ee.data.getTaskList().
+        batch_size (int): Maximum number of cancel calls sent in one batch request.
+
+    Returns:
+        None
+    """
+    total = len(task_list)
+    # One redrawn counter instead of a log line per cancelled task
+    status = ThrottledStatus("Cancel requests", total)
+    resource = _cloud_api_resource()
+    if resource is None or not hasattr(resource, "new_batch_http_request"):
+        # No batch client, so overlap the individual cancel round-trips instead
+        _cancel_in_pool(task_list, status)
+        return
+
+    tasks_by_name = {task["name"]: task for task in task_list}
+    # Names that need no further attempt; the rest go through the pool below
+    handled = set()
+
+    def callback(request_id, response, exception):
+        task = tasks_by_name[request_id]
+        if exception is not None:
+            code = getattr(getattr(exception, "resp", None), "status", None)
+            if code in RETRYABLE_HTTP_STATUSES:
+                # Left unhandled so ee.data.cancelOperation retries it
+                return
+            logging.error("Failed to cancel Task ID: %s %s", task["id"], exception)
+        else:
+            logging.debug("Canceled Task ID: %s", task["id"])
+        handled.add(request_id)
+        status.advance()
+
+    operations = resource.projects().operations()
+    for start in range(0, total, batch_size):
+        batch = resource.new_batch_http_request(callback=callback)
+        for task in task_list[start : start + batch_size]:
+            batch.add(
+                operations.cancel(name=task["name"], body={}), request_id=task["name"]
+            )
         try:
-            print("Attempting to cancel running tasks")
-            running_tasks = [
-                task for task in ee.data.getTaskList() if task["state"] == "RUNNING"
-            ]
-            if len(running_tasks) > 0:
-                for i, task in enumerate(running_tasks):
-                    ee.data.cancelOperation(task["name"])
-                    logging.info(
-                        f"Canceling {task['state']} Task {i+1} of {len(running_tasks)} with Task ID: {task['id']}"
-                    )
-                print(
-                    "Request completed with task ID or task type: {} cancelled".format(
-                        tasks
-                    )
-                )
-            elif len(running_tasks) == 0:
-                print("No Running tasks found")
+            batch.execute()
         except Exception as e:
-            logging.exception(e)
-    elif tasks == "pending":
+            logging.warning("Batch cancel failed, cancelling individually: %s", e)
+            break
+
+    remaining = [task for task in task_list if task["name"] not in handled]
+    if remaining:
+        _cancel_in_pool(remaining, status)
+
+
+def _cancel_in_pool(task_list, status):
+    import ee
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = {
+            executor.submit(ee.data.cancelOperation, task["name"]): task
+            for task in task_list
+        }
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logging.error("Failed to cancel Task ID: %s %s", task["id"], e)
+            else:
+                logging.debug("Canceled Task ID: %s", task["id"])
+            status.advance()
+
+
+# Task states targeted by each cancel keyword, with the messages shown for it
+CANCEL_STATES = {
+    "all": ({"RUNNING", "READY"}, "all tasks", "Running or Pending"),
+    "running": ({"RUNNING"}, "running tasks", "Running"),
+    "pending": ({"READY"}, "queued tasks or pending tasks", "Pending"),
+}
+
+
+def cancel_tasks(tasks):
+    import ee
+
+    # Cancels fan out across a thread pool, which suits the high-volume endpoint
+    initialize_ee(high_volume=True)
+    try:
+        task_list = get_task_list()
+    except Exception as e:
+        logging.exception(e)
+        return
+    if tasks in CANCEL_STATES:
+        states, label, empty_label = CANCEL_STATES[tasks]
         try:
-            print("Attempting to cancel queued tasks or pending tasks")
-            ready_tasks = [
-                task for task in ee.data.getTaskList() if task["state"] == "READY"
-            ]
-            if len(ready_tasks) > 0:
-                for i, task in enumerate(ready_tasks):
-                    ee.data.cancelOperation(task["name"])
-                    logging.info(
-                        f"Canceling {task['state']} Task {i+1} of {len(ready_tasks)} with Task ID: {task['id']}"
-                    )
+            print(f"Attempting to cancel {label}")
+            matching_tasks = [task for task in task_list if task["state"] in states]
+            if matching_tasks:
+                cancel_operations(matching_tasks)
                 print(
                     "Request completed with task ID or task type: {} cancelled".format(
                         tasks
                     )
                 )
-            elif len(ready_tasks) == 0:
-                print("No Pending tasks found")
+            else:
+                print(f"No {empty_label} tasks found")
         except Exception as e:
             logging.exception(e)
     elif tasks is not None:
         try:
-            logging.info(
-                "Attempting to cancel task with given task ID {}".format(tasks)
-            )
-            task_list = [task for task in ee.data.getTaskList() if task["id"] == tasks]
-            if task_list:
-                for task in task_list:
+            logging.info("Attempting to cancel task with given task ID %s", tasks)
+            matching_tasks = [task for task in task_list if task["id"] == tasks]
+            if matching_tasks:
+                for task in matching_tasks:
                     if task["state"] == "RUNNING" or task["state"] == "READY":
                         ee.data.cancelTask(task["id"])
                         print(
@@ -550,124 +791,155 @@ def cancel_tasks(tasks):
                     else:
                         print("Task in status {}".format(task["state"]))
             else:
-                logging.info("No task found with given task ID {}".format(tasks))
+                logging.info("No task found with given task ID %s", tasks)
         except Exception as error:
             logging.exception(error)
+    # Task states have changed, so the next lookup must go back to the server
+    _cached_task_list.cache_clear()
 
 
-def delete(ids):
-    try:
-        logging.info("Recursively deleting path: {}".format(ids))
-        process_output = subprocess.run(
-            ["earthengine", "rm", "-r", "{}".format(ids)],
-            capture_output=True,
-            text=True,
-        )
-        if len(process_output.stdout) > 0:
-            logging.info("output from commandline: {}".format(process_output.stdout))
-    except Exception as e:
-        logging.exception(e)
+CONTAINER_TYPES = {"FOLDER", "IMAGE_COLLECTION"}
 
 
-def rename_from_parser(args):
-    rename(directory=args.input)
+def _list_children(parent):
+    """Return every asset directly under parent, following pagination."""
+    import ee
 
+    children = []
+    params = {"parent": parent}
+    while True:
+        response = ee.data.listAssets(params)
+        children.extend(response.get("assets", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return children
+        params["pageToken"] = page_token
 
-def cookie_setup_from_parser(args):
-    cookie_setup()
 
+def _expand_assets(path):
+    """Return the assets for path, expanding a trailing Unix-style wildcard."""
+    import ee
 
-def quota_from_parser(args):
-    quota(project=args.project)
+    if not any(char in path for char in "*?["):
+        return [ee.data.getAsset(path)]
+    # The listing already carries each child's name and type, so no getAsset
+    parent, pattern = path.rsplit("/", 1)
+    return [
+        child
+        for child in _list_children(parent)
+        if fnmatch.fnmatchcase(child["name"].rsplit("/", 1)[-1], pattern)
+    ]
 
 
-def zipshape_from_parser(args):
-    zipshape(directory=args.input, export=args.output)
-
-
-def getmeta_from_parser(args):
-    getmeta(indir=args.input, mfile=args.metadata)
-
+def delete(ids):
+    """
+    Recursively delete an asset, or every asset matching a wildcard, in-process.
 
-def upload_from_parser(args):
-    upload(
-        user=args.user,
-        source_path=args.source,
-        destination_path=args.dest,
-        metadata_path=args.metadata,
-        nodata_value=args.nodata,
-        mask=args.mask,
-        pyramiding=args.pyramids,
-        overwrite=args.overwrite,
-    )
+    Children are listed with ee.data.listAssets and removed level by level,
+    deepest first, with each level's deletes issued from a thread pool.
 
+    Args:
+        ids (str): Asset path to delete; the last component may contain wildcards.
 
-def tabup_from_parser(args):
-    tabup(
-        uname=args.user,
-        dirc=args.source,
-        destination=args.dest,
-        x=args.x,
-        y=args.y,
-        overwrite=args.overwrite,
-    )
+    Returns:
+        None
+    """
+    import ee
 
+    # Deletes fan out across a thread pool, which suits the high-volume endpoint
+    initialize_ee(high_volume=True)
+    try:
+        logging.info("Recursively deleting path: %s", ids)
+        levels = []
+        current = _expand_assets(ids)
+        while current:
+            levels.append(current)
+            current = [
+                child
+                for asset in current
+                if asset["type"] in CONTAINER_TYPES
+                for child in _list_children(asset["name"])
+            ]
+    except Exception as e:
+        logging.exception(e)
+        return
+
+    # A container can only go once everything under it has been deleted
+    deleted = 0
+    status = ThrottledStatus("Delete requests", sum(map(len, levels)))
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        for level in reversed(levels):
+            futures = {
+                executor.submit(ee.data.deleteAsset, asset["name"]): asset
+                for asset in level
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error("Failed to delete %s: %s", futures[future]["name"], e)
+                else:
+                    deleted += 1
+                status.advance()
+    logging.info("Deleted %d of %d assets", deleted, sum(map(len, levels)))
 
-def tasks_from_parser(args):
-    tasks(state=args.state, id=args.id)
 
+spacing = "                               "
 
-def cancel_tasks_from_parser(args):
-    cancel_tasks(tasks=args.tasks)
 
+BOOL_VALUES = {"true": True, "t": True, "false": False, "f": False}
+PYRAMIDING_POLICIES = ("MEAN", "MODE", "MIN", "MAX", "SAMPLE")
 
-def delete_collection_from_parser(args):
-    delete(args.id)
 
+def _parse_bool(value):
+    # Convert at parse time so "False" never reaches upload() as a truthy string
+    try:
+        return BOOL_VALUES[value.lower()]
+    except KeyError:
+        raise argparse.ArgumentTypeError(f"invalid boolean value: {value!r}")
 
-spacing = "                               "
 
+# Earth Engine refuses new tasks once this many are queued for a user
+EE_TASK_QUEUE_LIMIT = 3000
 
-def main(args=None):
-    parser = argparse.ArgumentParser(
-        description="Simple Client for Earth Engine Uploads"
-    )
 
-    subparsers = parser.add_subparsers()
+def _max_inflight_tasks(value):
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if count < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    if count > EE_TASK_QUEUE_LIMIT:
+        logging.warning(
+            "--max-inflight-tasks %d exceeds the Earth Engine queue limit, using %d",
+            count,
+            EE_TASK_QUEUE_LIMIT,
+        )
+        count = EE_TASK_QUEUE_LIMIT
+    return count
 
-    parser_read = subparsers.add_parser(
-        "readme", help="Go the web based geeup readme page"
-    )
-    parser_read.set_defaults(func=read_from_parser)
 
-    parser_quota = subparsers.add_parser(
-        "quota", help="Print Earth Engine storage and asset count quota"
-    )
-    optional_named = parser_quota.add_argument_group("Optional named arguments")
+def _add_quota_arguments(parser):
+    optional_named = parser.add_argument_group("Optional named arguments")
     optional_named.add_argument(
         "--project",
         help="Project Name usually in format projects/project-name/assets/",
         default=None,
     )
-    parser_quota.set_defaults(func=quota_from_parser)
 
-    parser_rename = subparsers.add_parser(
-        "rename",
-        help="Renames filename to adhere to EE naming rules: Caution this is in place renaming",
-    )
-    required_named = parser_rename.add_argument_group("Required named arguments.")
+
+def _add_rename_arguments(parser):
+    required_named = parser.add_argument_group("Required named arguments.")
     required_named.add_argument(
         "--input",
         help="Path to the input directory with all files to be uploaded",
         required=True,
     )
-    parser_rename.set_defaults(func=rename_from_parser)
 
-    parser_zipshape = subparsers.add_parser(
-        "zipshape",
-        help="Zips all shapefiles and subsidary files in folder into individual zip files",
-    )
-    required_named = parser_zipshape.add_argument_group("Required named arguments.")
+
+def _add_zipshape_arguments(parser):
+    required_named = parser.add_argument_group("Required named arguments.")
     required_named.add_argument(
         "--input",
         help="Path to the input directory with all shape files",
@@ -678,12 +950,10 @@ def main(args=None):
         help="Destination folder Full path where shp, shx, prj and dbf files if present will be zipped and stored",
         required=True,
     )
-    parser_zipshape.set_defaults(func=zipshape_from_parser)
 
-    parser_getmeta = subparsers.add_parser(
-        "getmeta", help="Creates a generalized metadata for rasters in folder"
-    )
-    required_named = parser_getmeta.add_argument_group("Required named arguments.")
+
+def _add_getmeta_arguments(parser):
+    required_named = parser.add_argument_group("Required named arguments.")
     required_named.add_argument(
         "--input",
         help="Path to the input directory with all raster files",
@@ -692,19 +962,21 @@ def main(args=None):
     required_named.add_argument(
         "--metadata", help="Full path to export metadata.csv file", required=True
     )
-    parser_getmeta.set_defaults(func=getmeta_from_parser)
 
-    parser_cookie_setup = subparsers.add_parser(
-        "cookie_setup",
-        help="Setup cookies to be used for upload",
-    )
-    parser_cookie_setup.set_defaults(func=cookie_setup_from_parser)
 
-    parser_upload = subparsers.add_parser(
-        "upload",
-        help="Batch Image Uploader for uploading tif files to a GEE collection",
+def _add_shared_upload_arguments(required_named, optional_named):
+    # Options upload and tabup define identically, kept in one place
+    required_named.add_argument(
+        "-u", "--user", help="Google account name (gmail address)."
     )
-    required_named = parser_upload.add_argument_group("Required named arguments.")
+    optional_named.add_argument(
+        "--overwrite",
+        help="Default is No but you can pass yes or y",
+    )
+
+
+def _add_upload_arguments(parser):
+    required_named = parser.add_argument_group("Required named arguments.")
     required_named.add_argument(
         "--source", help="Path to the directory with images for upload.", required=True
     )
@@ -716,7 +988,7 @@ def main(args=None):
     required_named.add_argument(
         "-m", "--metadata", help="Path to CSV with metadata.", required=True
     )
-    optional_named = parser_upload.add_argument_group("Optional named arguments")
+    optional_named = parser.add_argument_group("Optional named arguments")
     optional_named.add_argument(
         "--nodata",
         type=int,
@@ -725,28 +997,32 @@ def main(args=None):
     optional_named.add_argument(
         "--mask",
         default=False,
-        choices=("True", "False", "t", "f"),
+        type=_parse_bool,
+        metavar="{True,False,t,f}",
         help="Binary to use last band for mask True or False",
     )
     optional_named.add_argument(
         "--pyramids",
+        type=str.upper,
+        choices=PYRAMIDING_POLICIES,
         help="Pyramiding Policy, MEAN, MODE, MIN, MAX, SAMPLE",
     )
     optional_named.add_argument(
-        "--overwrite",
-        help="Default is No but you can pass yes or y",
+        "--retry-failed",
+        action="store_true",
+        help="Only retry the images that failed in the last run to this destination",
     )
-    required_named.add_argument(
-        "-u", "--user", help="Google account name (gmail address)."
+    optional_named.add_argument(
+        "--max-inflight-tasks",
+        type=_max_inflight_tasks,
+        default=2800,
+        help=f"Pause submitting while this many tasks are queued or running (default 2800, at most {EE_TASK_QUEUE_LIMIT})",
     )
+    _add_shared_upload_arguments(required_named, optional_named)
 
-    parser_upload.set_defaults(func=upload_from_parser)
 
-    parser_tabup = subparsers.add_parser(
-        "tabup",
-        help="Batch Table Uploader for uploading shapefiles/CSVs to a GEE folder",
-    )
-    required_named = parser_tabup.add_argument_group("Required named arguments.")
+def _add_tabup_arguments(parser):
+    required_named = parser.add_argument_group("Required named arguments.")
     required_named.add_argument(
         "--source",
         help="Path to the directory with zipped files or CSV files for upload.",
@@ -757,10 +1033,7 @@ def main(args=None):
         help="Destination. Full path for upload to Google Earth Engine folder, e.g. users/pinkiepie/myfolder",
         required=True,
     )
-    required_named.add_argument(
-        "-u", "--user", help="Google account name (gmail address)."
-    )
-    optional_named = parser_tabup.add_argument_group("Optional named arguments")
+    optional_named = parser.add_argument_group("Optional named arguments")
     optional_named.add_argument(
         "--x",
         help="Column with longitude value",
@@ -769,17 +1042,11 @@ def main(args=None):
         "--y",
         help="Column with latitude value",
     )
-    optional_named.add_argument(
-        "--overwrite",
-        help="Default is No but you can pass yes or y",
-    )
-    parser_tabup.set_defaults(func=tabup_from_parser)
+    _add_shared_upload_arguments(required_named, optional_named)
 
-    parser_tasks = subparsers.add_parser(
-        "tasks",
-        help="Queries current task status [completed,running,ready,failed,cancelled]",
-    )
-    optional_named = parser_tasks.add_argument_group("Optional named arguments")
+
+def _add_tasks_arguments(parser):
+    optional_named = parser.add_argument_group("Optional named arguments")
     optional_named.add_argument(
         "--state",
         help="Query by state type COMPLETED|READY|RUNNING|FAILED",
@@ -788,38 +1055,315 @@ def main(args=None):
         "--id",
         help="Query by task id",
     )
-    parser_tasks.set_defaults(func=tasks_from_parser)
 
-    parser_cancel = subparsers.add_parser(
-        "cancel", help="Cancel all, running or ready tasks or task ID"
-    )
-    required_named = parser_cancel.add_argument_group("Required named arguments.")
+
+def _add_cancel_arguments(parser):
+    required_named = parser.add_argument_group("Required named arguments.")
     required_named.add_argument(
         "--tasks",
         help="You can provide tasks as running or pending or all or even a single task id",
         required=True,
         default=None,
     )
-    parser_cancel.set_defaults(func=cancel_tasks_from_parser)
 
-    parser_delete = subparsers.add_parser(
-        "delete",
-        help="Deletes collection and all items inside. Supports Unix-like wildcards.",
-    )
-    required_named = parser_delete.add_argument_group("Required named arguments.")
+
+def _add_delete_arguments(parser):
+    required_named = parser.add_argument_group("Required named arguments.")
     required_named.add_argument(
         "--id",
         help="Full path to asset for deletion. Recursively removes all folders, collections and images.",
     )
-    parser_delete.set_defaults(func=delete_collection_from_parser)
 
-    args = parser.parse_args()
+
+class _ArgumentRecorder:
+    """Stands in for a parser so an argument builder can be read without argparse."""
+
+    def __init__(self):
+        self.options = ["--help"]
+        self.choices = []
+
+    def add_argument(self, *names, **kwargs):
+        if names[0].startswith("-"):
+            self.options.extend(name for name in names if name.startswith("--"))
+        else:
+            self.choices.extend(kwargs.get("choices", ()))
+
+    def add_argument_group(self, *args, **kwargs):
+        return self
+
+
+def _subcommand_options():
+    """Return {subcommand: (option strings, positional choices)} from the builders."""
+    options = {}
+    for name, (_, add_arguments, _, _) in SUBCOMMANDS.items():
+        recorder = _ArgumentRecorder()
+        if add_arguments is not None:
+            add_arguments(recorder)
+        options[name] = (recorder.options, recorder.choices)
+    return options
+
+
+GLOBAL_OPTIONS = ["--help", "--no-version-check", "--events-jsonl"]
+# Global options that take a value, so completion must not read it as the subcommand
+GLOBAL_VALUE_OPTIONS = ["--events-jsonl"]
+
+
+def completions(shell):
+    """
+    Print a static completion script so tab completion never starts Python.
+
+    Args:
+        shell (str): One of bash, zsh or fish.
+
+    Returns:
+        None
+    """
+    options = _subcommand_options()
+    value_options = " ".join(GLOBAL_VALUE_OPTIONS)
+    if shell == "fish":
+        lines = [
+            "function __geeup_subcommand",
+            "    set -l tokens (commandline -opc)",
+            "    set -e tokens[1]",
+            "    set -l skip 0",
+            "    for token in $tokens",
+            "        if test $skip = 1",
+            "            set skip 0",
+            "        else if contains -- $token " + value_options,
+            "            set skip 1",
+            "        else if not string match -q -- '-*' $token",
+            "            echo $token",
+            "            return 0",
+            "        end",
+            "    end",
+            "    return 1",
+            "end",
+        ]
+        for name, (help_text, _, _, _) in SUBCOMMANDS.items():
+            description = help_text.replace("'", "\\'")
+            condition = f"'test (__geeup_subcommand) = {name}'"
+            lines.append(
+                f"complete -c geeup -f -n 'not __geeup_subcommand' -a {name} -d '{description}'"
+            )
+            opts, choices = options[name]
+            for option in opts:
+                lines.append(f"complete -c geeup -n {condition} -l {option[2:]}")
+            if choices:
+                lines.append(
+                    f"complete -c geeup -f -n {condition} -a '{' '.join(choices)}'"
+                )
+        for option in GLOBAL_OPTIONS:
+            takes_value = " -r -F" if option in GLOBAL_VALUE_OPTIONS else ""
+            lines.append(
+                f"complete -c geeup -n 'not __geeup_subcommand' -l {option[2:]}{takes_value}"
+            )
+        print("\n".join(lines))
+        return
+
+    cases = "\n".join(
+        f'        {name}) opts="{" ".join(opts)}" words="{" ".join(choices)}" ;;'
+        for name, (opts, choices) in options.items()
+    )
+    value_cases = "|".join(GLOBAL_VALUE_OPTIONS)
+    script = f"""_geeup() {{
+    local cur="${{COMP_WORDS[COMP_CWORD]}}" cmd="" skip="" word opts words=""
+    for word in "${{COMP_WORDS[@]:1:COMP_CWORD-1}}"; do
+        if [[ -n "$skip" ]]; then
+            skip=""
+            continue
+        fi
+        case "$word" in {value_cases}) skip=1 ;; -*) ;; *) cmd="$word"; break ;; esac
+    done
+    if [[ -n "$skip" ]]; then
+        COMPREPLY=($(compgen -f -- "$cur"))
+        return
+    fi
+    case "$cmd" in
+        "") opts="{" ".join(GLOBAL_OPTIONS + list(SUBCOMMANDS))}" ;;
+{cases}
+    esac
+    if [[ -z "$cmd" || "$cur" == -* ]]; then
+        COMPREPLY=($(compgen -W "$opts" -- "$cur"))
+    elif [[ -n "$words" ]]; then
+        COMPREPLY=($(compgen -W "$words" -- "$cur"))
+    else
+        COMPREPLY=($(compgen -f -- "$cur"))
+    fi
+}}
+complete -o filenames -F _geeup geeup"""
+    if shell == "zsh":
+        script = "autoload -U +X bashcompinit && bashcompinit\n" + script
+    print(script)
+
+
+def _add_completions_arguments(parser):
+    parser.add_argument("shell", choices=("bash", "zsh", "fish"))
+
+
+def _lazy_handler(module, name):
+    """Return a handler that imports module only when the subcommand runs."""
+
+    def handler(**kwargs):
+        return getattr(importlib.import_module(module, __package__), name)(**kwargs)
+
+    return handler
+
+
+# Subcommand name -> (help, argument builder, handler, {handler kwarg: args attribute})
+SUBCOMMANDS = {
+    "readme": ("Go the web based geeup readme page", None, readme, {}),
+    "init": (
+        "Install GDAL and other dependencies needed on Windows",
+        None,
+        windows_bootstrap,
+        {},
+    ),
+    "quota": (
+        "Print Earth Engine storage and asset count quota",
+        _add_quota_arguments,
+        quota,
+        {"project": "project"},
+    ),
+    "rename": (
+        "Renames filename to adhere to EE naming rules: Caution this is in place renaming",
+        _add_rename_arguments,
+        rename,
+        {"directory": "input"},
+    ),
+    "zipshape": (
+        "Zips all shapefiles and subsidary files in folder into individual zip files",
+        _add_zipshape_arguments,
+        zipshape,
+        {"directory": "input", "export": "output"},
+    ),
+    "getmeta": (
+        "Creates a generalized metadata for rasters in folder",
+        _add_getmeta_arguments,
+        getmeta,
+        {"indir": "input", "mfile": "metadata"},
+    ),
+    "cookie_setup": (
+        "Setup cookies to be used for upload",
+        None,
+        cookie_setup,
+        {},
+    ),
+    "upload": (
+        "Batch Image Uploader for uploading tif files to a GEE collection",
+        _add_upload_arguments,
+        _lazy_handler(".batch_uploader", "upload"),
+        {
+            "user": "user",
+            "source_path": "source",
+            "destination_path": "dest",
+            "metadata_path": "metadata",
+            "nodata_value": "nodata",
+            "mask": "mask",
+            "pyramiding": "pyramids",
+            "overwrite": "overwrite",
+            "max_inflight_tasks": "max_inflight_tasks",
+            "retry_failed": "retry_failed",
+        },
+    ),
+    "tabup": (
+        "Batch Table Uploader for uploading shapefiles/CSVs to a GEE folder",
+        _add_tabup_arguments,
+        _lazy_handler(".tuploader", "tabup"),
+        {
+            "uname": "user",
+            "dirc": "source",
+            "destination": "dest",
+            "x": "x",
+            "y": "y",
+            "overwrite": "overwrite",
+        },
+    ),
+    "tasks": (
+        "Queries current task status [completed,running,ready,failed,cancelled]",
+        _add_tasks_arguments,
+        tasks,
+        {"state": "state", "id": "id"},
+    ),
+    "cancel": (
+        "Cancel all, running or ready tasks or task ID",
+        _add_cancel_arguments,
+        cancel_tasks,
+        {"tasks": "tasks"},
+    ),
+    "delete": (
+        "Deletes collection and all items inside. Supports Unix-like wildcards.",
+        _add_delete_arguments,
+        delete,
+        {"ids": "id"},
+    ),
+    "completions": (
+        "Print a shell completion script for bash, zsh or fish",
+        _add_completions_arguments,
+        completions,
+        {"shell": "shell"},
+    ),
+}
+
+
+def _add_global_arguments(parser):
+    parser.add_argument(
+        "--no-version-check",
+        action="store_true",
+        help="Skip checking PyPI for a newer geeup release",
+    )
+    parser.add_argument(
+        "--events-jsonl",
+        metavar="PATH",
+        default=None,
+        help="Also write machine-readable progress events to PATH as JSON lines",
+    )
+
+
+def main(args=None):
+    argv = sys.argv[1:] if args is None else args
+    # No abbreviations, so this parser and the pre-parser below agree on options
+    parser = argparse.ArgumentParser(
+        description="Simple Client for Earth Engine Uploads", allow_abbrev=False
+    )
+    _add_global_arguments(parser)
+
+    subparsers = parser.add_subparsers()
+
+    # Every subcommand is listed, but only the one being run gets its arguments.
+    # Strip the global options (and their values) first to find which one that is.
+    global_parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    _add_global_arguments(global_parser)
+    _, remaining = global_parser.parse_known_args(argv)
+    requested = next((arg for arg in remaining if not arg.startswith("-")), None)
+    for name, (help_text, add_arguments, _, _) in SUBCOMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if name == requested and add_arguments is not None:
+            add_arguments(subparser)
+        subparser.set_defaults(command=name)
+
+    args = parser.parse_args(argv)
 
     try:
-        func = args.func
+        _, _, func, argmap = SUBCOMMANDS[args.command]
     except AttributeError:
         parser.error("too few arguments")
-    func(args)
+    if not args.no_version_check:
+        _start_version_check()
+    if args.events_jsonl:
+        open_event_sink(args.events_jsonl)
+    emit("command.started", command=args.command)
+    status = "error"
+    try:
+        func(**{kwarg: getattr(args, attr) for kwarg, attr in argmap.items()})
+        status = "ok"
+    except SystemExit as error:
+        status = "ok" if error.code in (None, 0) else "exit"
+        raise
+    except KeyboardInterrupt:
+        status = "interrupted"
+        raise
+    finally:
+        emit("command.finished", command=args.command, status=status)
 
 
 if __name__ == "__main__":
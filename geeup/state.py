@@ -0,0 +1,81 @@
+__copyright__ = """
+
+    Copyright 2023 Samapriya Roy
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+"""
+__license__ = "Apache 2.0"
+
+import hashlib
+import json
+import logging
+import os
+import time
+
+SCHEMA_VERSION = 1
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".config", "geeup")
+
+
+def state_path(command, destination):
+    """Return the checkpoint file used by command for uploads into destination."""
+    key = hashlib.sha1(f"{command}:{destination}".encode("utf-8")).hexdigest()
+    return os.path.join(STATE_DIR, f"{key}.json")
+
+
+def new_state(command, source, destination):
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "command": command,
+        "source": source,
+        "dest": destination,
+        "completed": [],
+        "failed": [],
+        "inflight_task_ids": [],
+        "timestamp": time.time(),
+    }
+
+
+def load_state(path):
+    """
+    Read a checkpoint written by save_state.
+
+    Checkpoints do not expire: each run to a destination overwrites the last.
+
+    Args:
+        path (str): Checkpoint file path.
+
+    Returns:
+        dict or None: The checkpoint, or None if missing or unreadable.
+    """
+    try:
+        with open(path) as infile:
+            state = json.load(infile)
+    except (OSError, ValueError):
+        return None
+    if state.get("schema_version") != SCHEMA_VERSION:
+        return None
+    return state
+
+
+def save_state(path, state):
+    """Write the checkpoint atomically so a crash never leaves a partial file."""
+    state["timestamp"] = time.time()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as outfile:
+            json.dump(state, outfile)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning("Could not save upload checkpoint %s: %s", path, e)
@@ -0,0 +1,100 @@
+__copyright__ = """
+
+    Copyright 2023 Samapriya Roy
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+"""
+__license__ = "Apache 2.0"
+
+import os
+import sys
+import time
+
+
+def set_canonical_input(enabled):
+    """
+    Turn line-buffered (canonical) terminal input on or off in-process.
+
+    Pasted cookie lists are longer than the 4096 byte canonical line limit,
+    so the cookie prompts switch it off while reading. Does nothing on
+    Windows or when stdin is not a terminal.
+
+    Args:
+        enabled (bool): True to restore canonical input, False to disable it.
+
+    Returns:
+        None
+    """
+    try:
+        import termios
+    except ImportError:
+        return
+    fd = sys.stdin.fileno()
+    if not os.isatty(fd):
+        return
+    attrs = termios.tcgetattr(fd)
+    if enabled:
+        attrs[3] |= termios.ICANON
+    else:
+        attrs[3] &= ~termios.ICANON
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+
+
+def _enable_windows_ansi():
+    # Windows 10+ consoles understand ANSI escapes once VT processing is on
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
+
+
+def clear_screen():
+    """Clear the terminal with an ANSI escape instead of spawning a shell."""
+    if os.name == "nt" and not _enable_windows_ansi():
+        os.system("cls")
+        return
+    print("\x1b[2J\x1b[H", end="", flush=True)
+
+
+class ThrottledStatus:
+    """
+    Single-line "label: done of total" counter redrawn at a bounded rate.
+
+    Chatty operations update it once per item, but the terminal is only
+    written to every interval seconds and once more for the final count.
+    """
+
+    def __init__(self, label, total, interval=0.125):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self._last_draw = 0.0
+
+    def advance(self, count=1):
+        self.done += count
+        now = time.monotonic()
+        if self.done >= self.total or now - self._last_draw >= self.interval:
+            self._last_draw = now
+            sys.stdout.write(f"\r{self.label}: {self.done} of {self.total}")
+            if self.done >= self.total:
+                sys.stdout.write("\n")
+            sys.stdout.flush()
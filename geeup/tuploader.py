@@ -22,7 +22,7 @@ import json
 import logging
 import os
 import platform
-import subprocess
+import re
 import sys
 import time
 
@@ -33,8 +33,13 @@ from cerberus.errors import BasicErrorHandler
 from natsort import natsorted
 from requests_toolbelt import MultipartEncoder
 
+from .ee_init import initialize_ee
+from .events import emit
+from .terminal import clear_screen, set_canonical_input
+
 lp = os.path.dirname(os.path.realpath(__file__))
-sys.path.append(lp)
+platform_name = platform.system().lower()
+cookie_jar = os.path.join(lp, "cookie_jar.json")
 
 table_exists = []
 gee_table_exists = []
@@ -46,13 +51,17 @@ logging.basicConfig(
 )
 
 
+ASSET_PATH_RE = re.compile(r"[a-zA-Z0-9/_-]+")
+INVALID_PATH_MESSAGE = "GEE file name & path cannot have spaces & can only have letters, numbers, hyphens and underscores"
+
+
 class CustomErrorHandler(BasicErrorHandler):
     def __init__(self, schema):
         self.custom_defined_schema = schema
 
     def _format_message(self, field, error):
         print("")
-        return "GEE file name & path cannot have spaces & can only have letters, numbers, hyphens and underscores"
+        return INVALID_PATH_MESSAGE
 
 
 def cookie_check(cookie_list):
@@ -74,20 +83,19 @@ def cookie_check(cookie_list):
 
 
 def get_auth_session(uname):
-    platform_info = platform.system().lower()
-    if str(platform_info) == "linux" or str(platform_info) == "darwin":
-        subprocess.check_call(["stty", "-icanon"])
-    if not os.path.exists("cookie_jar.json"):
+    if platform_name in ("linux", "darwin"):
+        set_canonical_input(False)
+    if not os.path.exists(cookie_jar):
         try:
             cookie_list = raw_input("Enter your Cookie List:  ")
         except Exception:
             cookie_list = input("Enter your Cookie List:  ")
         finally:
-            with open("cookie_jar.json", "w") as outfile:
+            with open(cookie_jar, "w") as outfile:
                 json.dump(json.loads(cookie_list), outfile)
         cookie_list = json.loads(cookie_list)
-    elif os.path.exists("cookie_jar.json"):
-        with open("cookie_jar.json") as json_file:
+    elif os.path.exists(cookie_jar):
+        with open(cookie_jar) as json_file:
             cookie_list = json.load(json_file)
         if cookie_check(cookie_list) is True:
             print("Using saved Cookies")
@@ -98,20 +106,11 @@ def get_auth_session(uname):
             except Exception:
                 cookie_list = input("Cookies Expired | Enter your Cookie List:  ")
             finally:
-                with open("cookie_jar.json", "w") as outfile:
+                with open(cookie_jar, "w") as outfile:
                     json.dump(json.loads(cookie_list), outfile)
                     cookie_list = json.loads(cookie_list)
-    time.sleep(5)
-    if str(platform.system().lower()) == "windows":
-        os.system("cls")
-    elif str(platform.system().lower()) == "linux":
-        os.system("clear")
-        subprocess.check_call(["stty", "icanon"])
-    elif str(platform.system().lower()) == "darwin":
-        os.system("clear")
-        subprocess.check_call(["stty", "icanon"])
-    else:
-        pass
+    clear_screen()
+    set_canonical_input(True)
     session = requests.Session()
     for cookies in cookie_list:
         session.cookies.set(cookies["name"], cookies["value"])
@@ -126,7 +125,7 @@ def get_auth_session(uname):
 
 
 def tabup(dirc, uname, destination, x, y, overwrite=None):
-    ee.Initialize()
+    initialize_ee()
     schema = {"folder_path": {"type": "string", "regex": "^[a-zA-Z0-9/_-]+$"}}
     folder_validate = {"folder_path": destination}
     v = Validator(schema, error_handler=CustomErrorHandler(schema))
@@ -200,7 +199,7 @@ def tabup(dirc, uname, destination, x, y, overwrite=None):
         )
         while task_count >= 2500:
             logging.info(
-                f"Total tasks running or submitted {task_count}: waiting for 5 minutes"
+                "Total tasks running or submitted %d: waiting for 5 minutes", task_count
             )
             time.sleep(300)
         auth_check = session.get(
@@ -252,18 +251,8 @@ def tabup(dirc, uname, destination, x, y, overwrite=None):
                                         }
                                     ],
                                 }
-                                schema = {
-                                    "asset_path": {
-                                        "type": "string",
-                                        "regex": "^[a-zA-Z0-9/_-]+$",
-                                    }
-                                }
-                                asset_validate = {"asset_path": asset_full_path}
-                                v = Validator(
-                                    schema, error_handler=CustomErrorHandler(schema)
-                                )
-                                if v.validate(asset_validate, schema) is False:
-                                    print(v.errors)
+                                if not ASSET_PATH_RE.fullmatch(asset_full_path):
+                                    print({"asset_path": [INVALID_PATH_MESSAGE]})
                                     raise Exception
                                 request_id = ee.data.newTaskId()[0]
                                 if (
@@ -278,7 +267,18 @@ def tabup(dirc, uname, destination, x, y, overwrite=None):
                                         request_id, main_payload, allow_overwrite=False
                                     )
                                 logging.info(
-                                    f"Ingesting {i+1} of {file_count} {str(os.path.basename(asset_full_path))} with Task Id: {output['id']} & status {output['started']}"
+                                    "Ingesting %d of %d %s with Task Id: %s & status %s",
+                                    i + 1,
+                                    file_count,
+                                    os.path.basename(asset_full_path),
+                                    output["id"],
+                                    output["started"],
+                                )
+                                emit(
+                                    "upload.file.completed",
+                                    path=full_path_to_table,
+                                    size=os.path.getsize(full_path_to_table),
+                                    task_id=output["id"],
                                 )
                             elif base_ext == ".csv":
                                 m = MultipartEncoder(
@@ -317,18 +317,8 @@ def tabup(dirc, uname, destination, x, y, overwrite=None):
                                             }
                                         ],
                                     }
-                                schema = {
-                                    "asset_path": {
-                                        "type": "string",
-                                        "regex": "^[a-zA-Z0-9/_-]+$",
-                                    }
-                                }
-                                asset_validate = {"asset_path": asset_full_path}
-                                v = Validator(
-                                    schema, error_handler=CustomErrorHandler(schema)
-                                )
-                                if v.validate(asset_validate, schema) is False:
-                                    print(v.errors)
+                                if not ASSET_PATH_RE.fullmatch(asset_full_path):
+                                    print({"asset_path": [INVALID_PATH_MESSAGE]})
                                     raise Exception
                                 request_id = ee.data.newTaskId()[0]
                                 if (
@@ -343,11 +333,27 @@ def tabup(dirc, uname, destination, x, y, overwrite=None):
                                         request_id, main_payload, allow_overwrite=False
                                     )
                                 logging.info(
-                                    f"Ingesting {i+1} of {file_count} {str(os.path.basename(asset_full_path))} with Task Id: {output['id']} & status {output['started']}"
+                                    "Ingesting %d of %d %s with Task Id: %s & status %s",
+                                    i + 1,
+                                    file_count,
+                                    os.path.basename(asset_full_path),
+                                    output["id"],
+                                    output["started"],
+                                )
+                                emit(
+                                    "upload.file.completed",
+                                    path=full_path_to_table,
+                                    size=os.path.getsize(full_path_to_table),
+                                    task_id=output["id"],
                                 )
                         except Exception as error:
                             print(error)
                             print(f"Failed to ingest {asset_full_path}")
+                            emit(
+                                "upload.file.failed",
+                                path=full_path_to_table,
+                                error=str(error),
+                            )
             except Exception as error:
                 print(error)
             except (KeyboardInterrupt, SystemExit) as e:
@@ -10,7 +10,7 @@ def readme():
 setup(
     name="geeup",
     version="1.0.1",
-    python_requires=">=3.6",
+    python_requires=">=3.8",
     packages=find_packages(),
     url="https://github.com/samapriya/geeup",
     install_requires=[
@@ -26,6 +26,7 @@ setup(
         "pathlib>=1.0.1",
         "lxml>=4.1.1",
         "oauth2client>=4.1.3",
+        "packaging>=20.0",
     ],
     license="Apache 2.0",
     long_description=readme(),
@@ -37,8 +38,6 @@ setup(
         "Natural Language :: English",
         "License :: OSI Approved :: Apache Software License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
         "Operating System :: OS Independent",